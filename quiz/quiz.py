@@ -19,6 +19,7 @@ Try:
   quiz.py question add
   quiz.py question disable 2-7
   quiz.py question toggle 1,6,7
+  quiz.py question stats 1,3-5
 
 Commands:
   test                  Test against limited number of questions. Results
@@ -57,20 +58,45 @@ Question:
   reset-all             Reset all questions statistics.
 
 Arguments:
-  <id>                  Existing dd of question from the database/csv.
+  <id>                  Existing id of question from the database/csv, range
+                        of ids or comma separated list of both, e.g. 1,3-5.
 '''
-import copy
 import logging
 import random
+import re
 import sys
 import time
 
-from tabulate import tabulate
-
-from tools.data import Data, Question, QuestionStatus, QuestionType
+from tools.data import (FIELDNAMES, Data, Question, QuestionStatus,
+                        QuestionType)
 from tools.docopt import docopt
+from tools.sampling import AliasTable, weighted_sample
 from tools.utilities import query_yes_no, logger
 
+LETTERS = ('A', 'B', 'C', 'D', 'E', 'F')
+SEPARATOR = '-' * 80
+GRID_MAX_ROWS = 200
+ID_TOKEN = re.compile(r'(\d+)(?:-(\d+))?')
+IDS_PATTERN = re.compile(r'\d+(?:-\d+)?(?:,\d+(?:-\d+)?)*')
+
+
+def _tabulate_rows(rows: list) -> str:
+    '''
+    Render rows in a tabulated form. Tables longer than GRID_MAX_ROWS
+    are drawn without the grid, which is much cheaper to render.
+
+    Args:
+        rows (list): of Question.tight_tuple() tuples.
+
+    Returns:
+        str: rendered table.
+    '''
+    from tabulate import tabulate  # only table printing commands need it
+
+    tablefmt = 'rounded_grid' if len(rows) <= GRID_MAX_ROWS else 'simple'
+
+    return tabulate(rows, headers=FIELDNAMES, tablefmt=tablefmt)
+
 
 class Quiz:
     '''
@@ -79,35 +105,38 @@ class Quiz:
     Attributes:
         qids (str): single or multipe question ids.
         data (Data): object responsible for read/write operations to db.
+        rng (random.Random): generator behind every random pick, pass a
+                             seeded one to make quizzes reproducible.
     '''
-    def __init__(self, qids, data) -> None:
+    def __init__(self, qids, data, rng: random.Random = None) -> None:
         self.data = data
+        self.rng = rng or random.Random()
         self.qids = qids or None
         self.ids = self._split_question_ids() if qids else None
 
     def _split_question_ids(self) -> list:
-        '''Convert str of ids to list.
+        '''Convert str of ids to list. Single ids and ranges can be
+        mixed, separated by commas, e.g. '3', '2-7' or '1,3-5,9'.
 
         Raises:
             ValueError: if value is not number(s) and/or can't be split
                         or id(s) not on db.
 
         Returns:
-            list: of question ids, e.g.: [3] or [1,3,5,6]
-        '''
-        if self.qids.isdigit():
-            qids = [int(self.qids)]
-        elif ',' in self.qids:
-            qids = self.qids.split(',')
-            qids = [int(qid) for qid in qids]
-        elif '-' in self.qids:
-            qid1, qid2 = self.qids.split('-')
-            qids = list(range(int(qid1), int(qid2) + 1))
-        else:
+            list: of question ids, e.g.: [3] or [1,3,4,5,9]
+        '''
+        qids_str = self.qids.replace(' ', '')
+
+        if not IDS_PATTERN.fullmatch(qids_str):
             raise ValueError('Wrong question id or or ids range.')
 
-        all_ids = [row.id for row in self.data.db]
-        missing_ids = [str(id) for id in qids if id not in all_ids]
+        qids = []
+        for match in ID_TOKEN.finditer(qids_str):
+            first = int(match[1])
+            last = int(match[2]) if match[2] else first
+            qids.extend(range(first, last + 1))
+
+        missing_ids = [str(id) for id in qids if id not in self.data.index]
 
         if missing_ids:
             raise ValueError(
@@ -122,12 +151,16 @@ class Quiz:
         Returns:
             list: of indexes, e.g. [2] or [3, 4, 5]
         '''
-        indexes = []
-        for qid in self.ids:
-            for i, row in enumerate(self.data.db):
-                if qid == row.id:
-                    indexes.append(i)
-        return indexes
+        return [self.data.index[qid] for qid in self.ids]
+
+    def _get_questions(self) -> list:
+        '''
+        Get questions matching ids, in the order they appear in db.
+
+        Returns:
+            list: of Question objects.
+        '''
+        return [self.data.db[i] for i in sorted(self._get_questions_index())]
 
     def _filter_by_mode(self, mode: str = 'mixed') -> list:
         '''
@@ -145,39 +178,35 @@ class Quiz:
         Returns:
             list: of Question objects.
         '''
-        new_rows = []
+        if mode == 'mixed':
+            return [row for row in self.data.db
+                    if row.status is QuestionStatus.ACTIVE]
 
-        for row in self.data.db:
-            if row.status.value == 'active':
-                if mode == 'mixed':
-                    new_rows.append(row)
-                elif mode == 'freeform':
-                    if row.type.value == 'freeform':
-                        new_rows.append(row)
-                elif mode == 'quiz':
-                    if row.type.value == 'quiz':
-                        new_rows.append(row)
-                else:
-                    raise TypeError('Chosen the wrong answering mode')
+        if mode not in ('freeform', 'quiz'):
+            raise TypeError('Chosen the wrong answering mode')
+
+        mode_type = QuestionType(mode)
 
-        return new_rows
+        return [row for row in self.data.db
+                if row.status is QuestionStatus.ACTIVE and row.type is mode_type]
 
     def _freeform_input(self) -> str:
         '''
-        User input to freeform question.
+        User input to freeform question. Blank answers are asked again,
+        surrounding whitespace is dropped.
 
         Returns:
             str: user answer to freeform question.
         '''
-        while True:
-            user_answer = input('Your answer: ')
-            if user_answer:
-                return user_answer
+        while not (user_answer := input('Your answer: ').strip()):
+            pass
+        return user_answer
 
     def _quiz_input(self, row: Question) -> str:
         '''
         Gets and validates user input against available choices for
-        that particular question.
+        that particular question. The answer is put into a random slot
+        among the choices, row.choices itself is left untouched.
 
         Args:
             row (Question): object containing question attributes.
@@ -185,29 +214,22 @@ class Quiz:
         Returns:
             str: user answer to question, e.g. 'Dublin'
         '''
-        abc = ['A', 'B', 'C', 'D', 'E', 'F']
+        choices = list(row.choices)
+        choices.insert(self.rng.randrange(len(choices) + 1), row.answer)
+        letters = LETTERS[:len(choices)]
 
-        choices = row.choices
-        choices.append(row.answer)
+        print('\n'.join(f'\t{letter}. {choice}'
+                        for letter, choice in zip(letters, choices)))
 
-        random.shuffle(choices)
-        choices = (dict(zip(abc, choices)))
-
-        for letter, choice in choices.items():
-            print(f'\t{letter}. {choice}')
-            if choice == row.answer:
-                i = row.choices.index(choice)
-                del row.choices[i]
-
-        while True:
-            user_letter = input('Choose letter: ')
-
-            if user_letter.upper() in abc[:len(choices)]:
-                return choices[user_letter.upper()]
+        while (user_letter := input('Choose letter: ').upper()) not in letters:
+            pass
+        return choices[letters.index(user_letter)]
 
     def _run_testing(self, rows: list, limited: bool = False) -> None:
         '''
         Gives user questions indefinitely or until limit is reached.
+        Answers are journaled by Data.save_row() as they come and the
+        db file is rewritten once when testing ends.
 
         Args:
             rows (list): of Question objects
@@ -220,9 +242,12 @@ class Quiz:
         try:
             num = 1
             while True:
-                if not limited:
-                    self._weighted_choices(rows)
-                for row in rows:
+                if limited:
+                    round_rows = rows
+                else:
+                    round_rows = self._weighted_choices(rows)
+
+                for row in round_rows:
                     print(f'{num}. {row.definition}')
 
                     if row.choices:
@@ -230,14 +255,14 @@ class Quiz:
                     else:
                         user_answer = self._freeform_input()
 
-                    if user_answer == row.answer:
-                        print('Success! Your answer is correct!')
+                    if row.is_correct(user_answer):
+                        result = 'Success! Your answer is correct!'
                         row.correct += 1
                         user_stats['correct'] += 1
                     else:
-                        print(f'You\'re wrong. Right answer: {row.answer}')
+                        result = f'You\'re wrong. Right answer: {row.answer}'
 
-                    print('-' * 80)
+                    print(f'{result}\n{SEPARATOR}')
                     row.times_shown += 1
                     user_stats['total'] += 1
 
@@ -249,7 +274,9 @@ class Quiz:
                     break
 
         except (EOFError, KeyboardInterrupt):
-            print('\n' + '-' * 80)
+            print('\n' + SEPARATOR)
+        finally:
+            self.data.flush()
 
         user_stats['duration'] = time.time() - start_time
 
@@ -258,7 +285,8 @@ class Quiz:
     def _user_stats_msg(self, stats: dict) -> None:
         '''
         Print user test statistics to terminal. Test statistics are also
-        outputed to file with.
+        outputed to file with. Nothing is logged if no question was
+        answered.
 
         Args:
             stats (dict): of statistics, e.g.:
@@ -268,20 +296,26 @@ class Quiz:
                             'duration': 14.929275274276733
                           }
         '''
-        total = f'{stats["correct"]}/{stats["total"]}'
-        total_perc = f'{stats["correct"] / stats["total"] * 100:.0f}%'
+        if not stats['total']:
+            return
 
         duration = time.strftime("%M min %S sec.",
                                  time.gmtime(stats['duration']))
 
         logging.info(
-            f'{total_perc} ({total}) correct answers. Test took {duration}'
+            '%.0f%% (%d/%d) correct answers. Test took %s',
+            stats['correct'] / stats['total'] * 100,
+            stats['correct'],
+            stats['total'],
+            duration
         )
 
     def _weighted_choices(self, rows: list) -> list:
         '''
         Selects random questions from list by the probability of it.
-        Questions with lower success rate will show-up more often.
+        Questions with lower success rate will show-up more often. When
+        all questions weigh the same, they are drawn uniformly without
+        building an alias table.
 
         Args:
             rows (list): of Question objects.
@@ -289,23 +323,38 @@ class Quiz:
         Returns:
             list: of Question objects that has weighted random choice applied.
         '''
-        weights = []
-        for row in rows:
-            if row.correct == 0:
-                weights.append(9.9)
-            else:
-                ratio = 10 - (row.correct / row.times_shown * 10)
-                weight = round(ratio, 1)
-                if weight == 0:
-                    weight = 0.5
-                weights.append(weight)
+        weights = [self._question_weight(row) for row in rows]
+
+        if len(set(weights)) == 1:
+            return self.rng.choices(rows, k=len(rows))
 
-        rows = random.choices(rows, weights=weights, k=(int(len(rows))))
-        return rows
+        table = AliasTable(weights, rng=self.rng)
+
+        return [rows[table.draw()] for _ in rows]
+
+    @staticmethod
+    def _question_weight(row: Question) -> float:
+        '''
+        Weight of question in random selection, from 0.5 for always
+        answered correctly to 9.9 for never answered correctly. Counts
+        edited by hand so that correct exceeds times_shown are treated
+        as always correct instead of dividing by zero.
+
+        Args:
+            row (Question): object containing question attributes.
+
+        Returns:
+            float: selection weight.
+        '''
+        if row.correct == 0:
+            return 9.9
+        shown = max(row.times_shown, row.correct)
+        return round(10 - row.correct / shown * 10, 1) or 0.5
 
     def test(self, amount: int = 5, answer_mode: str = 'mixed') -> None:
         '''
-        Test user for a limited amount of questions.
+        Test user for a limited amount of questions. Questions with lower
+        success rate are more likely to be picked.
 
         Args:
             amount (int, optional): amount of questions to test against.
@@ -324,10 +373,14 @@ class Quiz:
             sys.exit('At least 5 available questions required to start test.')
 
         if amount > len(rows):
-            raise ValueError('Required amount of questions is lower than '
-                             f'available questions. {amount}>{len(rows)}.')
+            raise ValueError(f'Only {len(rows)} questions are available, '
+                             f'but {amount} were requested.')
 
-        rows = random.sample(rows, amount)
+        if amount == len(rows):
+            self.rng.shuffle(rows)
+        else:
+            weights = [self._question_weight(row) for row in rows]
+            rows = weighted_sample(rows, weights, amount, rng=self.rng)
 
         self._run_testing(rows, limited=True)
 
@@ -339,7 +392,9 @@ class Quiz:
                                          Defaults to 'mixed'.
         '''
         rows = self._filter_by_mode(mode=answer_mode)
-        rows = random.sample(rows, len(rows))
+
+        if not rows:
+            sys.exit('No available questions to practice.')
 
         self._run_testing(rows, limited=False)
 
@@ -357,15 +412,9 @@ class Quiz:
         Raises:
             ValueError: if <quiz> is typed, but there are no <choices> present.
         '''
-        try:
-            last_id = max(row.id for row in self.data.db)
-        except ValueError:
-            last_id = 0
-
-        preview_row = [row for row in self.data.db if row.id == last_id]
-
         print('Example question:\n')
-        self.print_stats(preview_row)
+        for row in self.data.db[-1:]:
+            self._print_single_row(row)
 
         qu = input('question;answer;choices;type: ').strip().split(';')
 
@@ -376,40 +425,37 @@ class Quiz:
             raise ValueError('There are no choices, but type is selected as quiz.')
 
         row = Question(
-            id=last_id + 1,
+            id=self.data.next_id,
             definition=qu[0],
             answer=qu[1],
             choices=choices,
             type=QuestionType(qu[3]),
         )
-        self.data.db.append(row)
+        self.data.append(row)
         self.data.save()
 
-        self.print_stats([row])
+        self._print_single_row(row)
 
     def remove(self) -> None:
         '''
         Remove question(s).
         '''
-        indexes = self._get_questions_index()
-        indexes.sort()
+        indexes = set(self._get_questions_index())
 
-        for i, _ in reversed(list(enumerate(self.data.db))):
-            if i in indexes:
-                self.data.db.pop(i)
+        self.data.db = [row for i, row in enumerate(self.data.db)
+                        if i not in indexes]
 
+        self.data.reindex()
         self.data.save()
 
     def reset(self) -> None:
         '''
         Reset question(s) statistics.
         '''
-        for row in self.data.db:
-            for id in self.ids:
-                if row.id == id:
-                    row.status = QuestionStatus('active')
-                    row.times_shown = 0
-                    row.correct = 0
+        for row in self._get_questions():
+            row.status = QuestionStatus.ACTIVE
+            row.times_shown = 0
+            row.correct = 0
         self.data.save()
         self.print_stats()
 
@@ -426,13 +472,11 @@ class Quiz:
         '''
         Toggle question(s) status from active to inactive and vice versa.
         '''
-        for row in self.data.db:
-            for id in self.ids:
-                if row.id == id:
-                    if row.status.value == 'inactive':
-                        row.status = QuestionStatus('active')
-                    elif row.status.value == 'active':
-                        row.status = QuestionStatus('inactive')
+        for row in self._get_questions():
+            if row.status is QuestionStatus.INACTIVE:
+                row.status = QuestionStatus.ACTIVE
+            elif row.status is QuestionStatus.ACTIVE:
+                row.status = QuestionStatus.INACTIVE
 
         self.data.save()
         self.print_stats()
@@ -441,11 +485,9 @@ class Quiz:
         '''
         Change question(s) status from inactive to active.
         '''
-        for row in self.data.db:
-            for id in self.ids:
-                if row.id == id:
-                    if row.status.value == 'inactive':
-                        row.status = QuestionStatus('active')
+        for row in self._get_questions():
+            if row.status is QuestionStatus.INACTIVE:
+                row.status = QuestionStatus.ACTIVE
         self.data.save()
         self.print_stats()
 
@@ -453,11 +495,9 @@ class Quiz:
         '''
         Change question(s) status from active to inactive.
         '''
-        for row in self.data.db:
-            for id in self.ids:
-                if row.id == id:
-                    if row.status.value == 'active':
-                        row.status = QuestionStatus('inactive')
+        for row in self._get_questions():
+            if row.status is QuestionStatus.ACTIVE:
+                row.status = QuestionStatus.INACTIVE
         self.data.save()
         self.print_stats()
 
@@ -475,24 +515,23 @@ class Quiz:
         Raises:
             ValueError: if <quiz> is typed, but there are no <choices> present.
         '''
-        for id in self.ids:
-            for row in self.data.db:
-                if row.id == id:
-                    self.print_stats([row])
+        for i in self._get_questions_index():
+            row = self.data.db[i]
+            self._print_single_row(row)
 
-                    qu = input('question;answer;choices;type: ').strip().split(';')
+            qu = input('question;answer;choices;type: ').strip().split(';')
 
-                    choices = [ch.strip() for ch in qu[2].split(',')]
-                    choices = list(filter(None, choices))  # remove empties
+            choices = [ch.strip() for ch in qu[2].split(',')]
+            choices = list(filter(None, choices))  # remove empties
 
-                    row.definition = qu[0]
-                    row.answer = qu[1]
-                    row.choices = choices
-                    row.type = QuestionType(qu[3])
+            row.definition = qu[0]
+            row.answer = qu[1]
+            row.choices = choices
+            row.type = QuestionType(qu[3])
 
-                    if len(row.choices) == 0 and row.type.value == 'quiz':
-                        msg = 'Type is selected as quiz, but no choices added.'
-                        raise ValueError(msg)
+            if len(row.choices) == 0 and row.type is QuestionType.QUIZ:
+                msg = 'Type is selected as quiz, but no choices added.'
+                raise ValueError(msg)
         self.data.save()
         self.print_stats()
 
@@ -502,8 +541,21 @@ class Quiz:
         '''
         if query_yes_no('Do you really want to delete all the questions?'):
             self.data.db = []
+            self.data.reindex()
             self.data.save()
 
+    @staticmethod
+    def _print_single_row(row: Question) -> None:
+        '''
+        Output single question on one line. Used for previews in add and
+        update, where a whole table would be overkill.
+
+        Args:
+            row (Question): object containing question attributes.
+        '''
+        print(f'{row.id}: {row.definition} -> {row.answer} '
+              f'[{row.type.value}] {", ".join(row.choices)}')
+
     def print_stats(self, rows: list = None, all=None) -> None:
         '''
         Output to terminal one or more questions attributes in a
@@ -517,18 +569,13 @@ class Quiz:
         if all:
             rows = self.data.db
 
-        if not rows:
-            rows = [row for row in self.data.db if row.id in self.ids]
-
-        rows = copy.deepcopy(rows)
+        if not rows and self.ids:
+            rows = self._get_questions()
 
-        for row in rows:
-            row.choices = ', '.join(row.choices)
-            row.status = row.status.value
-            row.type = row.type.value
+        rows = [row.tight_tuple() for row in rows]
 
         if rows:
-            print(tabulate(rows, headers='keys', tablefmt='rounded_grid'))
+            print(_tabulate_rows(rows))
         else:
             print('No questions are present in database.')
 
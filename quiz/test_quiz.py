@@ -1,5 +1,12 @@
+import os
+import random
+import shutil
+
+import pytest
+
 from quiz import Quiz
-from tools.data import Data
+from tools.data import Data, Question
+from tools.sampling import AliasTable, weighted_sample
 
 
 def test_split_question_ids():
@@ -13,6 +20,12 @@ def test_split_question_ids():
     quiz = Quiz(qids='1,4', data=data)
     assert quiz._split_question_ids() == [1, 4]
 
+    quiz = Quiz(qids='1,3-4', data=data)
+    assert quiz._split_question_ids() == [1, 3, 4]
+
+    with pytest.raises(ValueError):
+        Quiz(qids='1;4', data=data)
+
 def test_get_questions_index():
     data = Data(filename='test_db.csv')
     quiz = Quiz(qids='1', data=data)
@@ -24,6 +37,58 @@ def test_get_questions_index():
     quiz = Quiz(qids='1,3,4', data=data)
     assert quiz._get_questions_index() == [0, 2, 3]
 
+def test_filter_by_mode():
+    data = Data(filename='test_db.csv')
+    quiz = Quiz(qids=None, data=data)
+    rows = quiz._filter_by_mode('freeform')
+    assert [row.id for row in rows] == [12, 13, 15, 20]
+    assert quiz._filter_by_mode('quiz') == []
+    assert quiz._filter_by_mode() == rows
+
+    with pytest.raises(TypeError):
+        quiz._filter_by_mode('typing')
+
+def test_question_weight():
+    row = Question(id=1, definition='Capital of Latvia?', answer='Riga',
+                   choices=[])
+    assert Quiz._question_weight(row) == 9.9
+
+    row.correct, row.times_shown = 2, 4
+    assert Quiz._question_weight(row) == 5.0
+
+    row.correct = 4
+    assert Quiz._question_weight(row) == 0.5
+
+    row.correct, row.times_shown = 3, 0
+    assert Quiz._question_weight(row) == 0.5
+
+def test_is_correct():
+    row = Question(id=1, definition='Capital of Latvia?', answer='Riga',
+                   choices=[])
+    assert row.is_correct('riga ')
+    assert not row.is_correct('Vilnius')
+
+def test_alias_table():
+    table = AliasTable([1, 3])
+    assert table.prob == [0.5, 1.0]
+    assert table.alias == [1, 1]
+
+    table = AliasTable([0, 2.5, 0])
+    assert {table.draw() for _ in range(100)} == {1}
+
+    for weights in ([], [0, 0]):
+        with pytest.raises(ValueError):
+            AliasTable(weights)
+
+def test_weighted_sample():
+    assert sorted(weighted_sample('abcde', [1] * 5, 5)) == list('abcde')
+    assert sorted(weighted_sample('abc', [0, 1, 9.9], 3)) == ['b', 'c']
+    assert len(weighted_sample('abcde', [0.5, 1, 2, 4, 8], 2)) == 2
+
+    weights = [0.5, 1, 2, 4, 8]
+    assert (weighted_sample('abcde', weights, 3, rng=random.Random(7)) ==
+            weighted_sample('abcde', weights, 3, rng=random.Random(7)))
+
 def test_disable():
     data = Data(filename='test_db.csv')
     quiz = Quiz(qids='1,3,4', data=data)
@@ -32,4 +97,37 @@ def test_disable():
 def test_reset_all():
     data = Data(filename='test_db.csv')
     quiz = Quiz(qids='1-4', data=data)
-    assert quiz.reset_all() is None
\ No newline at end of file
+    assert quiz.reset_all() is None
+
+def test_save_row_journal(tmp_path):
+    db_file = str(tmp_path / 'db.csv')
+    shutil.copy('test_db.csv', db_file)
+    data = Data(filename=db_file)
+    row = data.db[0]
+    row.times_shown += 1
+    data.save_row(row)
+    assert os.path.exists(data.journal)
+    assert Data(filename=db_file).db[0].times_shown == row.times_shown
+
+    data.flush()
+    assert not data.dirty
+    assert not os.path.exists(data.journal)
+
+def test_replay_cut_journal(tmp_path):
+    db_file = str(tmp_path / 'db.csv')
+    shutil.copy('test_db.csv', db_file)
+    with open(f'{db_file}.wal', 'w', newline='') as file:
+        file.write('1,active,3,\r\n1,inactive,2,4\r\n1,active,9,1')
+
+    row = Data(filename=db_file).db[0]
+    assert row.status.value == 'inactive'
+    assert (row.correct, row.times_shown) == (2, 4)
+
+def test_remove(tmp_path):
+    db_file = str(tmp_path / 'db.csv')
+    shutil.copy('test_db.csv', db_file)
+    quiz = Quiz(qids='2-4', data=Data(filename=db_file))
+    quiz.remove()
+    assert [row.id for row in quiz.data.db[:3]] == [1, 6, 7]
+    assert quiz.data.index[6] == 1
+    assert [row.id for row in Data(filename=db_file).db[:3]] == [1, 6, 7]
@@ -1,8 +1,14 @@
+import atexit
 import csv
+import os
 
 from enum import Enum
 from dataclasses import dataclass
 
+FIELDNAMES = ('id', 'definition', 'answer', 'choices',
+              'status', 'type', 'correct', 'times_shown')
+BUFFER_SIZE = 1 << 20
+
 
 class QuestionType(Enum):
     QUIZ = 'quiz'
@@ -14,7 +20,7 @@ class QuestionStatus(Enum):
     INACTIVE = 'inactive'
 
 
-@dataclass
+@dataclass(slots=True)
 class Question:
     id: int
     definition: str
@@ -25,71 +31,190 @@ class Question:
     correct: int = 0
     times_shown: int = 0
 
-    def tight_dict(self) -> dict:
+    def is_correct(self, answer: str) -> bool:
         """
-        Returns "cleaned-up" version of dictionary, that
-        Question.__dict__ usually returns. Without classes names
-        in it or unnecessary double qotes or brackets.
+        Check user answer ignoring case and surrounding whitespace.
+
+        Args:
+            answer (str): user answer, e.g. 'dublin '
+
+        Returns:
+            bool: True if answer matches question answer.
         """
-        return {
-            'id': self.id,
-            'definition': self.definition,
-            'answer': self.answer,
-            'choices': ', '.join(self.choices),
-            'status': self.status.value,
-            'type': self.type.value,
-            'correct': self.correct,
-            'times_shown': self.times_shown
-        }
+        return answer.strip().casefold() == self.answer.strip().casefold()
+
+    def tight_tuple(self) -> tuple:
+        """
+        Returns question fields as plain values in FIELDNAMES order,
+        ready to be written as a CSV row.
+        """
+        return (
+            self.id,
+            self.definition,
+            self.answer,
+            ', '.join(self.choices),
+            self.status.value,
+            self.type.value,
+            self.correct,
+            self.times_shown
+        )
 
 
 class Data:
     '''
     Read and write operations to main questions database CSV file.
+
+    Changes made by save_row() are appended to a journal file next to
+    the database (<filename>.wal) instead of rewriting the whole CSV.
+    The journal is replayed on load and folded back into the CSV by
+    save(). flush() saves only when there are such pending changes and
+    runs once on exit if the journal was written.
     '''
     def __init__(self, filename) -> None:
         self.filename = filename
+        self.journal = f'{filename}.wal'
+        self._journal_file = None
         self.db: list = []
+        self.index: dict = {}
+        self.next_id = 1
+        self.dirty = False
         self.get()
 
     def get(self) -> None:
         '''
         Read CSV file and create dataclass object from it.
+
+        Rows are read with plain csv.reader and fields are picked by
+        their header position, so no intermediate dict is built per row.
+        '''
+        with open(self.filename, newline='', encoding='utf-8',
+                  buffering=BUFFER_SIZE) as file:
+            reader = csv.reader(file)
+            col = {name: i for i, name in enumerate(next(reader))}
+
+            id_, definition, answer, choices, status, type_, correct, shown = (
+                col[name] for name in FIELDNAMES
+            )
+
+            self.db = [
+                Question(
+                    id=int(row[id_]),
+                    definition=row[definition],
+                    answer=row[answer],
+                    choices=[ch.strip() for ch in row[choices].split(',')]
+                    if row[choices] else [],
+                    status=QuestionStatus(row[status]),
+                    type=QuestionType(row[type_]),
+                    correct=int(row[correct]),
+                    times_shown=int(row[shown])
+                )
+                for row in reader if row
+            ]
+
+        self.reindex()
+        self.next_id = max((row.id for row in self.db), default=0) + 1
+        self._replay_journal()
+
+    def reindex(self) -> None:
+        '''
+        Rebuild question id to db position lookup. Must be called after
+        rows are removed or reordered.
+        '''
+        self.index = {row.id: i for i, row in enumerate(self.db)}
+
+    def append(self, row) -> None:
+        '''
+        Add new row to the end of db and index it. Within a session ids
+        are not reused, next_id only grows. On load it is recomputed as
+        highest id + 1, so the id of a removed last row can come back.
         '''
-        with open(self.filename) as file:
-            for row in csv.DictReader(file):
-                choices = row['choices']
-                if choices:
-                    choices = choices.split(',')
-                    choices = [ch.strip() for ch in choices]
-
-                self.db.append(Question(
-                    definition=row['definition'],
-                    answer=row['answer'],
-                    choices=choices,
-                    id=int(row['id']),
-                    type=QuestionType(row['type']),
-                    status=QuestionStatus(row['status']),
-                    correct=int(row['correct']),
-                    times_shown=int(row['times_shown'])
-                ))
+        self.index[row.id] = len(self.db)
+        self.db.append(row)
+        self.next_id = max(self.next_id, row.id + 1)
+
+    def _replay_journal(self) -> None:
+        '''
+        Apply row changes logged by save_row() since the last save().
+        Entries without a line ending were cut short by a crash and,
+        like any entry that doesn't parse, are skipped.
+        '''
+        if not os.path.exists(self.journal):
+            return
+
+        with open(self.journal, newline='', encoding='utf-8') as file:
+            for line in file:
+                if not line.endswith('\n'):
+                    continue
+                try:
+                    id_, status, correct, shown = line.rstrip().split(',')
+                    id_, status = int(id_), QuestionStatus(status)
+                    correct, shown = int(correct), int(shown)
+                except ValueError:
+                    continue
+
+                i = self.index.get(id_)
+                if i is not None:
+                    row = self.db[i]
+                    row.status = status
+                    row.correct = correct
+                    row.times_shown = shown
+                    self.dirty = True
+
+    def _close_journal(self) -> None:
+        '''
+        Close and remove journal, its entries are already in the CSV.
+        '''
+        if self._journal_file:
+            self._journal_file.close()
+            self._journal_file = None
+            atexit.unregister(self.flush)
+
+        if os.path.exists(self.journal):
+            os.remove(self.journal)
 
     def save(self) -> None:
         '''
-        Write whole database to file.
+        Write whole database to file. Rows go to a temporary file first,
+        which then replaces the database, so an interrupted save can't
+        leave a truncated CSV behind.
         '''
-        with open(self.filename, 'w') as file:
-            fieldnames = ['id', 'definition', 'answer', 'choices',
-                          'status', 'type', 'correct', 'times_shown']
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows([i.tight_dict() for i in self.db])
+        tmp_filename = f'{self.filename}.tmp'
+
+        with open(tmp_filename, 'w', newline='', encoding='utf-8',
+                  buffering=BUFFER_SIZE) as file:
+            writer = csv.writer(file)
+            writer.writerow(FIELDNAMES)
+            writer.writerows(row.tight_tuple() for row in self.db)
+
+        os.replace(tmp_filename, self.filename)
+
+        self.dirty = False
+        self._close_journal()
+
+    def flush(self) -> None:
+        '''
+        Write database to file if save_row() changed anything since the
+        last save.
+        '''
+        if self.dirty:
+            self.save()
 
     def save_row(self, new_row) -> None:
         '''
-        Replace existing row with "new" row and save.
+        Replace existing row with "new" row and log its statistics to
+        the journal. The CSV itself is rewritten on the next save().
         '''
-        for i, row in enumerate(self.db):
-            if int(row.id) == int(new_row.id):
-                self.db[i] = new_row
-                self.save()
+        self.db[self.index[new_row.id]] = new_row
+        self.dirty = True
+
+        if self._journal_file is None:
+            self._journal_file = open(self.journal, 'a', newline='',
+                                      encoding='utf-8', buffering=1)
+            atexit.register(self.flush)
+
+        csv.writer(self._journal_file).writerow((
+            new_row.id,
+            new_row.status.value,
+            new_row.correct,
+            new_row.times_shown
+        ))
@@ -0,0 +1,86 @@
+import heapq
+import random
+
+
+class AliasTable:
+    '''
+    Draws indexes with probability proportional to their weights using
+    Vose's alias method. Building the table takes O(n), after that every
+    draw is O(1), unlike random.choices which bisects cumulative weights.
+
+    Attributes:
+        prob (list): chance to keep index i once slot i is picked.
+        alias (list): index returned for slot i otherwise.
+        rng (random.Random): generator used by draw().
+
+    Raises:
+        ValueError: if weights are empty or add up to zero.
+    '''
+    def __init__(self, weights: list, rng: random.Random = None) -> None:
+        self.rng = rng or random.Random()
+
+        n = len(weights)
+        total = sum(weights)
+        if not total > 0:
+            raise ValueError('At least one weight must be positive.')
+        scaled = [weight * n / total for weight in weights]
+
+        # slots left unpaired below keep their own index, their scaled
+        # weight is 1 up to rounding errors
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+
+        small = [i for i, weight in enumerate(scaled) if weight < 1]
+        large = [i for i, weight in enumerate(scaled) if weight >= 1]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+
+            scaled[more] -= 1 - scaled[less]
+            if scaled[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+
+    def draw(self) -> int:
+        '''
+        Draw one index.
+
+        Returns:
+            int: index of chosen weight.
+        '''
+        i = self.rng.randrange(len(self.prob))
+        return i if self.rng.random() < self.prob[i] else self.alias[i]
+
+
+def weighted_sample(population: list, weights: list, k: int,
+                    rng: random.Random = None) -> list:
+    '''
+    Pick k distinct items, each one with probability proportional to its
+    weight (Efraimidis-Spirakis A-Res). Every item gets a random key
+    u ** (1 / weight) and the items with the k largest keys are chosen,
+    which takes a single pass and O(n log k) time. Items with zero
+    weight are never picked. Picks are shuffled, because by key order
+    the heaviest items would nearly always come first.
+
+    Args:
+        population (list): items to pick from.
+        weights (list): weight of every item in population.
+        k (int): amount of items to pick.
+        rng (random.Random, optional): generator to draw keys from.
+
+    Returns:
+        list: of picked items, in random order.
+    '''
+    rng = rng or random.Random()
+    keyed = (
+        (rng.random() ** (1 / weight), item)
+        for item, weight in zip(population, weights) if weight > 0
+    )
+    picked = [item for _, item in heapq.nlargest(k, keyed,
+                                                 key=lambda x: x[0])]
+    rng.shuffle(picked)
+    return picked
@@ -1,6 +1,9 @@
 import logging
+import logging.handlers
 import sys
 
+HANDLER_NAME = 'quiz'
+
 
 def query_yes_no(question, default='yes'):
     '''
@@ -39,17 +42,29 @@ def query_yes_no(question, default='yes'):
 def logger(filename):
     '''
     Logs messages to file and stdout. Both use different formatting.
+    File records are buffered and written in batches, on errors, or
+    when logging shuts down at exit. Does nothing if handlers added by
+    an earlier call are still there, so they don't stack when called
+    more than once.
     '''
+    rootLogger = logging.getLogger()
+    if any(h.name == HANDLER_NAME for h in rootLogger.handlers):
+        return
+
     cli_formatter = logging.Formatter('%(message)s')
     std_formatter = logging.Formatter('%(asctime)s %(message)s',
                                       datefmt='%Y-%m-%d %H:%M:%S')
-    rootLogger = logging.getLogger()
     rootLogger.setLevel(logging.DEBUG)
 
     file_handler = logging.FileHandler(filename)
     file_handler.setFormatter(std_formatter)
-    rootLogger.addHandler(file_handler)
+    memory_handler = logging.handlers.MemoryHandler(
+        capacity=1024, flushLevel=logging.ERROR, target=file_handler
+    )
+    memory_handler.set_name(HANDLER_NAME)
+    rootLogger.addHandler(memory_handler)
 
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(cli_formatter)
+    console_handler.set_name(HANDLER_NAME)
     rootLogger.addHandler(console_handler)
@@ -9,95 +9,153 @@ The args option to play "peace" where the lowest card wins.
 import random
 import sys
 
+from collections import deque
+
+# cards put down in a draw, they go to whoever wins the next round
+WAR_PILE = deque()
+
+
+SUITS = ('spades', 'clubs', 'hearts', 'diamonds')
+_RNG = random.Random()
+
 
 class Card:
-    COLORS = ['spades', 'clubs', 'hearts', 'diamonds']
+    '''
+    Card is packed into a single int: (value - 1) * 4 + suit index, so
+    card >> 2 compares values and card & 3 picks the suit.
+    '''
+    __slots__ = ('card',)
 
     def __init__(self, color, value) -> None:
-        self.card = (value, color)
+        self.card = (value - 1) * 4 + SUITS.index(color)
+
+
+def fmt(card: int) -> str:
+    '''Card as it is shown to players.
+
+    Args:
+        card (int): packed card, e.g. 12
+
+    Returns:
+        str: with card color and value, e.g. 'spades 4'
+    '''
+    return f'{SUITS[card & 3]} {(card >> 2) + 1}'
+
+
+def fisher_yates(cards: list, rand64=_RNG.getrandbits) -> None:
+    '''Shuffle cards in place. Swap index is picked with Lemire's
+    multiply-shift, (64 random bits * n) >> 64, instead of
+    random.shuffle's rejection sampling. For a 52 card deck the bias is
+    below 2 ** -58.
+
+    Args:
+        cards (list): to shuffle.
+        rand64 (callable, optional): returns k random bits.
+                                     Defaults to bound _RNG.getrandbits.
+    '''
+    for i in range(len(cards) - 1, 0, -1):
+        j = (rand64(64) * (i + 1)) >> 64
+        cards[i], cards[j] = cards[j], cards[i]
 
 
 class Deck:
     def __init__(self) -> None:
-        self.cards = [Card(color, value).card for value in range(1, 14) for color in Card.COLORS]
+        self.cards = list(range(len(SUITS) * 13))  # every packed Card
         self.shuffle()
 
     def shuffle(self):
-        random.shuffle(self.cards)
+        fisher_yates(self.cards)
 
 
 class Player:
-    pile = []
+    __slots__ = ('name', 'cards')
 
     def __init__(self, name: str) -> None:
         self.name = name
-        self.cards = []
-        self.pile = []
+        self.cards = deque()
 
-    def draw_card(self) -> tuple:
+    def draw_card(self) -> int:
         '''Take a card from the top of the deck.
 
         Returns:
-            tuple: with card value and color, e.g. (4, 'spades')
+            int: packed card, e.g. 12 for spades 4
         '''
         if not self.cards:
             sys.exit(f'No more cards left for {self.name}. Oponent won')
 
-        return self.cards.pop(0)
+        return self.cards.popleft()
 
-    def add_cards(self, cards: list) -> None:
-        '''Add card to the bottom of the deck.
+    def add_cards(self, cards) -> None:
+        '''Add cards to the bottom of the deck.
 
         Args:
-            cards (list): with card value and color, e.g. [(4, 'spades')]
+            cards (iterable): of packed cards, e.g. (12, 41)
         '''
-        self.cards.append(cards)
-
-        if Player.pile:
-            print(f'Cards left in pile: {len(Player.pile)}')
-            self.cards = Player.pile + self.cards
-            Player.pile = []
+        self.cards.extend(cards)
 
     def cards_left(self):
         return len(self.cards)
 
 
-def draw(p1: Player, p2: Player) -> None:
+def draw(p1: Player, p2: Player, verbose: bool = True) -> None:
+    '''Play one round, the higher card takes both cards.
+
+    Args:
+        p1 (Player): first player.
+        p2 (Player): second player.
+        verbose (bool, optional): print round details. Defaults to True.
+    '''
     c1, c2 = p1.draw_card(), p2.draw_card()
-    print(f'{p1.name} "{c1[1]} {c1[0]}" vs {p2.name} "{c2[1]} {c2[0]}"')
-
-    if c1[0] > c2[0]:
-        p1.add_cards(c1)
-        p1.add_cards(c2)
-    elif c2[0] > c1[0]:
-        p2.add_cards(c2)
-        p2.add_cards(c1)
+    if verbose:
+        print(f'{p1.name} "{fmt(c1)}" vs {p2.name} "{fmt(c2)}"')
+
+    v1, v2 = c1 >> 2, c2 >> 2
+
+    if v1 > v2:
+        winner = p1
+        p1.add_cards((c1, c2))
+    elif v1 < v2:
+        winner = p2
+        p2.add_cards((c2, c1))
     else:
-        print('Draw')
-        Player.pile.extend([c1] + [c2] + [p1.draw_card()] + [p2.draw_card()])
+        winner = None
+        if verbose:
+            print('Draw')
+        WAR_PILE.extend((c1, c2, p1.draw_card(), p2.draw_card()))
 
-    print(f'{p1.name} cards: {p1.cards_left()}, {p2.name} cards: {p2.cards_left()}')
-    print('-' * 50)
+    if winner and WAR_PILE:
+        if verbose:
+            print(f'Cards left in pile: {len(WAR_PILE)}')
+        winner.add_cards(WAR_PILE)
+        WAR_PILE.clear()
+
+    if verbose:
+        print(f'{p1.name} cards: {p1.cards_left()}, {p2.name} cards: {p2.cards_left()}')
+        print('-' * 50)
 
 
 def main() -> None:
+    verbose = '--quiet' not in sys.argv[1:]
+
     deck = Deck()
 
     player, computer = Player('Player'), Player('ClosedAI')
-    player.cards, computer.cards = deck.cards[::2], deck.cards[1::2]
+    player.cards = player_cards = deque(deck.cards[::2])
+    computer.cards = computer_cards = deque(deck.cards[1::2])
 
     round = 1
-    while player.cards and computer.cards:
-        print(f'Round {round}:')
+    while player_cards and computer_cards:
+        if verbose:
+            print(f'Round {round}:')
 
-        draw(player, computer)
+        draw(player, computer, verbose)
 
         round += 1
 
-        if not len(player.cards):
-            print(f'{computer.name} won.')
-        if not len(computer.cards):
-            print(f'{player.name} won.')
+    if not player_cards:
+        print(f'{computer.name} won.')
+    if not computer_cards:
+        print(f'{player.name} won.')
 
 
 if __name__ == '__main__':